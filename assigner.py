@@ -0,0 +1,131 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class Agent:
+    def __init__(self, user_id: str, capacity: int = 10, skills: Optional[Iterable[str]] = None):
+        self.user_id = user_id
+        self.capacity = max(1, capacity)
+        self.skills = sorted(set(skills or []))
+
+    def to_dict(self) -> dict:
+        return {"user_id": self.user_id, "capacity": self.capacity, "skills": self.skills}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Agent":
+        return cls(data["user_id"], data.get("capacity", 10), data.get("skills") or [])
+
+
+class AutoAssigner:
+    """Picks the least-utilized agent for a ticket in O(log agents).
+
+    One min-heap of (load / capacity, load, agent_id) is kept for all agents
+    and one per skill. Heaps are updated lazily: a load change pushes fresh
+    entries and stale ones are discarded when they reach the top, so both
+    assignment and load updates stay logarithmic.
+    """
+
+    def __init__(self, agents: Optional[Iterable[Agent]] = None):
+        self.agents: Dict[str, Agent] = {}
+        self.load: Dict[str, int] = {}
+        self._all: List[Tuple[float, int, str]] = []
+        self._by_skill: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._counted: Dict[int, str] = {}  # open ticket_id -> agent whose load includes it
+        for agent in agents or []:
+            self.add_agent(agent)
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def _push(self, agent_id: str) -> None:
+        agent = self.agents[agent_id]
+        load = self.load[agent_id]
+        entry = (load / agent.capacity, load, agent_id)
+        heapq.heappush(self._all, entry)
+        for skill in agent.skills:
+            heapq.heappush(self._by_skill.setdefault(skill, []), entry)
+
+    def add_agent(self, agent: Agent) -> None:
+        self.agents[agent.user_id] = agent
+        self.load.setdefault(agent.user_id, 0)
+        self._push(agent.user_id)
+
+    def remove_agent(self, agent_id: str) -> None:
+        # Heap entries for a removed agent are dropped lazily in _top()
+        self.agents.pop(agent_id, None)
+        self.load.pop(agent_id, None)
+        self._counted = {tid: aid for tid, aid in self._counted.items() if aid != agent_id}
+
+    def adjust(self, agent_id: str, delta: int) -> None:
+        if agent_id not in self.agents:
+            return
+        self.load[agent_id] = max(0, self.load[agent_id] + delta)
+        if len(self._all) > 4 * len(self.agents) + 64:
+            # Mostly stale entries by now; rebuilding is amortized O(1) per push
+            self._rebuild()
+        else:
+            self._push(agent_id)
+
+    def _rebuild(self) -> None:
+        self._all = []
+        self._by_skill = {}
+        for agent_id, agent in self.agents.items():
+            load = self.load[agent_id]
+            entry = (load / agent.capacity, load, agent_id)
+            self._all.append(entry)
+            for skill in agent.skills:
+                self._by_skill.setdefault(skill, []).append(entry)
+        heapq.heapify(self._all)
+        for heap in self._by_skill.values():
+            heapq.heapify(heap)
+
+    def _top(self, heap: List[Tuple[float, int, str]]) -> Optional[Tuple[float, int, str]]:
+        while heap:
+            utilization, load, agent_id = heap[0]
+            if agent_id in self.agents and self.load[agent_id] == load:
+                agent = self.agents[agent_id]
+                if utilization == load / agent.capacity:
+                    return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def pick(self, tags: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Least-utilized agent with spare capacity, preferring agents whose
+        skills match one of `tags`; falls back to any agent."""
+        best = None
+        for tag in tags or []:
+            heap = self._by_skill.get(tag)
+            top = self._top(heap) if heap else None
+            if top is not None and top[0] < 1 and (best is None or top < best):
+                best = top
+        if best is None:
+            top = self._top(self._all)
+            if top is not None and top[0] < 1:
+                best = top
+        return best[2] if best else None
+
+    def sync(self, ticket_id: int, ticket) -> None:
+        """Update loads after `ticket` changed (None when deleted). Idempotent."""
+        previous = self._counted.get(ticket_id)
+        current = None
+        if ticket is not None and ticket.status == "open" and ticket.assigned_to_user_id in self.agents:
+            current = ticket.assigned_to_user_id
+        if previous == current:
+            return
+        if previous is not None:
+            del self._counted[ticket_id]
+            self.adjust(previous, -1)
+        if current is not None:
+            self._counted[ticket_id] = current
+            self.adjust(current, +1)
+
+    def load_from(self, tickets: Iterable) -> None:
+        """Recount loads from scratch over `tickets` (used when first built)."""
+        for agent_id in self.load:
+            self.load[agent_id] = 0
+        self._counted.clear()
+        for t in tickets:
+            if t.status == "open" and t.assigned_to_user_id in self.agents:
+                self._counted[t.ticket_id] = t.assigned_to_user_id
+                self.load[t.assigned_to_user_id] += 1
+        self._rebuild()
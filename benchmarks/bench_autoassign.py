@@ -0,0 +1,81 @@
+"""Simulate auto-assignment throughput and load balance.
+
+Usage: python benchmarks/bench_autoassign.py [--agents 10000] [--tickets 1000000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from assigner import Agent, AutoAssigner  # noqa: E402
+
+
+class _SimTicket:
+    __slots__ = ("ticket_id", "status", "assigned_to_user_id", "tags")
+
+    def __init__(self, ticket_id, tags):
+        self.ticket_id = ticket_id
+        self.status = "open"
+        self.assigned_to_user_id = None
+        self.tags = tags
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=10_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--skills", type=int, default=50, help="Distinct skill tags")
+    parser.add_argument("--close-rate", type=float, default=0.5, help="Chance an open ticket is closed after each assignment")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = [f"skill{i}" for i in range(args.skills)]
+    agents = [
+        Agent(f"agent{i}", capacity=rng.randint(50, 200), skills=rng.sample(skills, rng.randint(1, 3)))
+        for i in range(args.agents)
+    ]
+    assigner = AutoAssigner(agents)
+
+    # Pre-generate tickets so the timed loop measures assignment only
+    tickets = [_SimTicket(i, rng.sample(skills, rng.randint(0, 2))) for i in range(args.tickets)]
+    open_tickets = []
+    unassigned = 0
+
+    start = time.perf_counter()
+    for ticket in tickets:
+        agent_id = assigner.pick(ticket.tags)
+        if agent_id is None:
+            unassigned += 1
+        else:
+            ticket.assigned_to_user_id = agent_id
+            assigner.sync(ticket.ticket_id, ticket)
+            open_tickets.append(ticket)
+        if open_tickets and rng.random() < args.close_rate:
+            # Close a random open ticket (swap-remove keeps this O(1))
+            idx = rng.randrange(len(open_tickets))
+            closed = open_tickets[idx]
+            open_tickets[idx] = open_tickets[-1]
+            open_tickets.pop()
+            closed.status = "closed"
+            assigner.sync(closed.ticket_id, closed)
+    elapsed = time.perf_counter() - start
+
+    utilization = [assigner.load[a.user_id] / a.capacity for a in agents]
+    loads = [assigner.load[a.user_id] for a in agents]
+    print(f"agents={args.agents} tickets={args.tickets} skills={args.skills} close_rate={args.close_rate}")
+    print(f"elapsed={elapsed:.2f}s throughput={args.tickets / elapsed:,.0f} tickets/s "
+          f"({elapsed / args.tickets * 1e6:.1f} us/ticket incl. closes)")
+    print(f"unassigned (all agents full)={unassigned} open at end={len(open_tickets)}")
+    print(f"load: mean={statistics.fmean(loads):.2f} variance={statistics.pvariance(loads):.2f} "
+          f"min={min(loads)} max={max(loads)}")
+    print(f"utilization: mean={statistics.fmean(utilization):.4f} variance={statistics.pvariance(utilization):.6f} "
+          f"min={min(utilization):.4f} max={max(utilization):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Compare state file size and save/load time across encodings, plus export speed.
+
+Usage: python benchmarks/bench_storage.py [--tickets 100000]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import storage  # noqa: E402
+from ticket import Ticket  # noqa: E402
+
+
+def _build_state(n: int, rng: random.Random) -> dict:
+    words = ["vpn", "email", "printer", "login", "slow", "outage", "reset", "laptop", "payroll", "wifi"]
+    tickets = {}
+    history = []
+    now = datetime.datetime.now()
+    for i in range(1, n + 1):
+        t = Ticket(
+            i,
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 12))),
+            rng.choice(["low", "medium", "high"]),
+            None,
+            owner_user_id=f"user{rng.randint(1, 500)}",
+            assigned_to_user_id=rng.choice([None, f"agent{rng.randint(1, 50)}"]),
+            tags=rng.sample(words, rng.randint(0, 2)),
+        )
+        t.created_at = now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        if rng.random() < 0.4:
+            t.close()
+        tickets[str(i)] = t.to_dict()
+        history.append(t.to_dict())
+    return {
+        "next_id": n + 1,
+        "tickets": tickets,
+        "history": history,
+        "standard_queue": [],
+        "high_priority_queue": [],
+        "undo_stack": [],
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    state = _build_state(args.tickets, random.Random(args.seed))
+    print(f"tickets={args.tickets} (state includes history, as saved by HelpDeskSystem)")
+    print(f"{'encoding':<22}{'size MB':>10}{'save s':>10}{'load s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = os.path.join(tmp, "indent4.json")
+
+        def save_indented():
+            with open(baseline, "w") as f:
+                json.dump(state, f, indent=4)
+
+        def load_indented():
+            with open(baseline) as f:
+                json.load(f)
+
+        rows = [("json indent=4 (old)", baseline, save_indented, load_indented)]
+        for name, suffix in [("json compact", ".json")] + [
+            (f"compact + {c}", ".json" + storage.SUFFIXES[c]) for c in storage.available_compressions()
+        ]:
+            path = os.path.join(tmp, "state" + suffix)
+            rows.append((name, path, lambda p=path: storage.dump_json(state, p), lambda p=path: storage.load_json(p)))
+
+        for name, path, save, load in rows:
+            save_s = _time(save, args.repeat)
+            load_s = _time(load, args.repeat)
+            print(f"{name:<22}{os.path.getsize(path) / 1e6:>10.2f}{save_s:>10.3f}{load_s:>10.3f}")
+
+        tickets = [Ticket.from_dict(d) for d in state["tickets"].values()]
+        print()
+        print(f"{'export':<22}{'size MB':>10}{'write s':>10}")
+        from helpdesk import _export_lines
+
+        for fmt in ("jsonl", "csv"):
+            for compression in [None] + storage.available_compressions():
+                path = os.path.join(tmp, f"export.{fmt}" + (storage.SUFFIXES[compression] if compression else ""))
+
+                def write(p=path, c=compression, f=fmt):
+                    with storage.open_text(p, "w", compression=c, newline="") as out:
+                        for chunk in _export_lines(tickets, f):
+                            out.write(chunk)
+
+                label = fmt + (f" + {compression}" if compression else "")
+                elapsed = _time(write, args.repeat)
+                print(f"{label:<22}{os.path.getsize(path) / 1e6:>10.2f}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import datetime
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl  # POSIX only; serializes sequence allocation across processes
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class ChangeFeed:
+    """Append-only journal of sequenced change events, one JSON object per line.
+
+    Sequence numbers are strictly increasing, which lets readers resume from
+    a cursor by binary-searching the file on byte offsets instead of
+    scanning it from the start.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    # Writing
+
+    def append(self, events: List[Dict[str, Any]]) -> int:
+        """Assign sequence numbers to `events`, append them in one write and return the last seq."""
+        if not events:
+            return self.last_seq()
+        with open(self.path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                end = self._after_last_newline(f, size)
+                if end < size:
+                    # An interrupted append left a partial line; drop it so
+                    # the next event does not get joined onto it.
+                    f.truncate(end)
+                seq = self._last_seq_in(f, end)
+                ts = datetime.datetime.now().isoformat()
+                lines = []
+                for event in events:
+                    seq += 1
+                    lines.append(json.dumps({'seq': seq, 'ts': ts, **event}, separators=(',', ':')))
+                f.seek(0, os.SEEK_END)
+                f.write(("\n".join(lines) + "\n").encode('utf-8'))
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return seq
+
+    @staticmethod
+    def _after_last_newline(f, before: int) -> int:
+        """Offset just past the last newline located before `before` (0 if none)."""
+        pos = before
+        chunk = 4096
+        while pos > 0:
+            start = max(0, pos - chunk)
+            f.seek(start)
+            i = f.read(pos - start).rfind(b"\n")
+            if i >= 0:
+                return start + i + 1
+            pos = start
+            chunk *= 2
+        return 0
+
+    @classmethod
+    def _last_seq_in(cls, f, end: int) -> int:
+        """Seq of the last complete line ending at `end`."""
+        if end == 0:
+            return 0
+        start = cls._after_last_newline(f, end - 1)
+        f.seek(start)
+        return json.loads(f.read(end - start))['seq']
+
+    def last_seq(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            return self._last_seq_in(f, self._after_last_newline(f, f.tell()))
+
+    # Reading
+
+    @staticmethod
+    def _line_start(f, pos: int) -> int:
+        """First line boundary at or after `pos`."""
+        if pos == 0:
+            return 0
+        f.seek(pos - 1)
+        f.readline()
+        return f.tell()
+
+    def _offset_after(self, f, since: int) -> int:
+        """Byte offset of the first event with seq > since (binary search on offsets)."""
+        f.seek(0, os.SEEK_END)
+        lo, hi = 0, f.tell()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(self._line_start(f, mid))
+            line = f.readline()
+            if not line.endswith(b"\n") or json.loads(line)['seq'] > since:
+                hi = mid
+            else:
+                lo = mid + 1
+        return self._line_start(f, lo)
+
+    def read(self, since: int = 0, limit: int = 100, offset: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Return up to `limit` events with seq > since and the byte offset to continue from."""
+        if not os.path.exists(self.path):
+            return [], 0
+        events = []
+        with open(self.path, 'rb') as f:
+            if offset is None:
+                offset = self._offset_after(f, since)
+            f.seek(offset)
+            while len(events) < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                offset = f.tell()
+                event = json.loads(line)
+                if event['seq'] > since:
+                    events.append(event)
+        return events, offset
+
+    def iter_batches(
+        self,
+        since: int = 0,
+        batch_size: int = 100,
+        follow: bool = False,
+        poll_interval: float = 0.05,
+        max_poll_interval: float = 1.0,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield lists of events after `since`.
+
+        With `follow`, keeps tailing the journal; while idle the poll only
+        stats the file and backs off up to `max_poll_interval`.
+        """
+        offset = None
+        interval = poll_interval
+        last_stat = None
+        while True:
+            events, offset = self.read(since, batch_size, offset)
+            if events:
+                since = events[-1]['seq']
+                interval = poll_interval
+                yield events
+                continue
+            if not follow:
+                return
+            while True:
+                time.sleep(interval)
+                interval = min(max_poll_interval, interval * 2)
+                try:
+                    st = os.stat(self.path)
+                except OSError:
+                    continue
+                # mtime too: dropping a partial tail and appending can leave the size unchanged
+                if (st.st_size, st.st_mtime_ns) != last_stat:
+                    last_stat = (st.st_size, st.st_mtime_ns)
+                    break
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.iter_batches():
+            yield from batch
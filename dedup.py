@@ -0,0 +1,154 @@
+import hashlib
+import re
+import sqlite3
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# MinHash parameters: NUM_PERM = BANDS * ROWS. With 8 bands of 4 rows the LSH
+# candidate threshold sits around 0.6 Jaccard; candidates are then verified
+# against the full signature so only pairs above `threshold` are linked.
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+# Only the head of a description is shingled; flood tickets share their
+# opening text and this keeps signing cost bounded for long descriptions.
+MAX_SIGNED_CHARS = 200
+DEFAULT_THRESHOLD = 0.8
+
+_SIG_STRUCT = struct.Struct(f"<{NUM_PERM}I")
+_BAND_BYTES = ROWS * 4
+_WORD_RE = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (ticket_id INTEGER PRIMARY KEY, sig BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS buckets (band_key INTEGER PRIMARY KEY, ticket_id INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _shingles(text: str) -> set:
+    normalized = " ".join(_WORD_RE.findall(text.lower()))[:MAX_SIGNED_CHARS]
+    data = normalized.encode("utf-8")
+    if len(data) <= SHINGLE_SIZE:
+        return {data}
+    return {data[i:i + SHINGLE_SIZE] for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> Tuple[int, ...]:
+    # One SHAKE-128 digest per shingle yields NUM_PERM independent 32-bit
+    # hashes; the per-position minimum is then taken in C via zip/min.
+    digest_size = NUM_PERM * 4
+    rows = [_SIG_STRUCT.unpack(hashlib.shake_128(s).digest(digest_size)) for s in _shingles(text)]
+    return tuple(map(min, zip(*rows)))
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _band_keys(packed: bytes) -> List[int]:
+    # A keyed 64-bit digest per band (band index as the key) so all bands
+    # share one table and keys are stable across processes and platforms.
+    return [
+        int.from_bytes(
+            hashlib.blake2b(packed[band * _BAND_BYTES:(band + 1) * _BAND_BYTES], digest_size=8, key=bytes([band])).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+class DedupIndex:
+    """MinHash/LSH index over ticket descriptions, stored in SQLite.
+
+    Only canonical tickets are stored; duplicates are linked to a canonical and
+    never indexed themselves, so the index grows with distinct incidents rather
+    than with flood volume. The band table lives on disk keyed by band key, so
+    a lookup or insert touches about BANDS rows and memory stays bounded by
+    SQLite's page cache however many signatures are stored. Changes are
+    written when `commit()` is called.
+
+    Ticket ids are only meaningful for one ticket store, so an `owner` (the
+    state's id) is recorded and an index left over from another or a reset
+    state is emptied instead of linking tickets by stale ids.
+    """
+
+    def __init__(self, path: str = ":memory:", threshold: float = DEFAULT_THRESHOLD, owner: Optional[str] = None):
+        self.threshold = threshold
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        if owner is not None:
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'owner'").fetchone()
+            if row is None or row[0] != owner:
+                self._db.execute("DELETE FROM signatures")
+                self._db.execute("DELETE FROM buckets")
+                self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('owner', ?)", (owner,))
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def __contains__(self, ticket_id: int) -> bool:
+        return self._db.execute("SELECT 1 FROM signatures WHERE ticket_id = ?", (ticket_id,)).fetchone() is not None
+
+    def find(self, text: str, is_live=None) -> Tuple[Optional[int], Tuple[int, ...]]:
+        """Return (canonical_id or None, signature) for `text`.
+
+        `is_live` is an optional callback used to lazily drop canonicals whose
+        tickets were closed or deleted since they were indexed.
+        """
+        sig = minhash_signature(text)
+        keys = _band_keys(_SIG_STRUCT.pack(*sig))
+        rows = self._db.execute(
+            f"SELECT DISTINCT s.ticket_id, s.sig FROM buckets b JOIN signatures s ON s.ticket_id = b.ticket_id"
+            f" WHERE b.band_key IN ({','.join('?' * len(keys))})",
+            keys,
+        ).fetchall()
+        best_id = None
+        best_score = 0.0
+        for candidate, packed in rows:
+            if is_live is not None and not is_live(candidate):
+                self.discard(candidate)
+                continue
+            score = estimate_similarity(sig, _SIG_STRUCT.unpack(packed))
+            if score >= self.threshold and score > best_score:
+                best_id, best_score = candidate, score
+        return best_id, sig
+
+    def add(self, ticket_id: int, sig: Tuple[int, ...]) -> None:
+        packed = _SIG_STRUCT.pack(*sig)
+        self._db.execute("INSERT OR REPLACE INTO signatures (ticket_id, sig) VALUES (?, ?)", (ticket_id, packed))
+        # First canonical to claim a band keeps it
+        self._db.executemany(
+            "INSERT OR IGNORE INTO buckets (band_key, ticket_id) VALUES (?, ?)",
+            [(key, ticket_id) for key in _band_keys(packed)],
+        )
+
+    def discard(self, ticket_id: int) -> bool:
+        row = self._db.execute("SELECT sig FROM signatures WHERE ticket_id = ?", (ticket_id,)).fetchone()
+        if row is None:
+            return False
+        self._db.execute("DELETE FROM signatures WHERE ticket_id = ?", (ticket_id,))
+        self._db.executemany(
+            "DELETE FROM buckets WHERE band_key = ? AND ticket_id = ?",
+            [(key, ticket_id) for key in _band_keys(row[0])],
+        )
+        return True
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def clusters(tickets: Iterable) -> List[Tuple[int, List[int]]]:
+    """Group tickets tagged 'dup' under their canonical, largest cluster first."""
+    groups: Dict[int, List[int]] = {}
+    for t in tickets:
+        if t.parent_id is not None and "dup" in t.tags:
+            groups.setdefault(t.parent_id, []).append(t.ticket_id)
+    return sorted(groups.items(), key=lambda kv: (-len(kv[1]), kv[0]))
@@ -1,5 +1,9 @@
+import csv
+import io
 import json
 import os
+import sys
+import uuid
 import datetime
 from typing import List, Dict, Any, Optional
 import click
@@ -7,9 +11,21 @@ import click
 from ticket import Ticket
 from LinkedList import LinkedList
 from Stack import Stack, Queue, PriorityQueue
+from dedup import DedupIndex, clusters as dedup_clusters
+from assigner import Agent, AutoAssigner
+from changefeed import ChangeFeed
+import storage
+from pagination import SORT_KEYS, DEFAULT_PAGE_SIZE, page_count
+from query import QueryError, compile_query, involving
 try:
-    from session import get_current_user, login as session_login, logout as session_logout
+    from session import get_current_user, login as session_login, logout as session_logout, use_profile, list_profiles, active_profile
 except Exception:  # Fallbacks if session module missing
+    def use_profile(name):
+        return None
+    def list_profiles():
+        return []
+    def active_profile():
+        return None
     def get_current_user():
         return None
     def session_login(*args, **kwargs):
@@ -19,13 +35,24 @@ except Exception:  # Fallbacks if session module missing
 
 try:
     # Optional UI enhancements with Rich
-    from ui import render_user_dashboard, render_admin_dashboard
+    from ui import render_user_dashboard, render_admin_dashboard, run_live_dashboard
     _HAS_UI = True
 except Exception:
     _HAS_UI = False
 
 class HelpDeskSystem:
-    STATE_FILE = 'helpdesk_state.json'
+    # A .gz/.bz2/.xz/.zst suffix stores the state compressed
+    STATE_FILE = os.environ.get('HELPDESK_STATE_FILE', 'helpdesk_state.json')
+    # Side files are named after the state file so each state gets its own
+    # change journal and near-duplicate index. The index is kept apart from
+    # the state so only --dedup pays for it.
+    EVENTS_FILE = STATE_FILE + '.events.jsonl'
+    DEDUP_FILE = STATE_FILE + '.dedup.db'
+    # SLA targets in hours by priority
+    SLA_HOURS = {'high': 4, 'medium': 24, 'low': 72}
+    PRIORITY_RANK = {'low': 0, 'medium': 1, 'high': 2}
+    # Aging buckets as (label, upper bound in hours); None means unbounded
+    AGING_BUCKETS = [('0-24h', 24), ('1-3d', 72), ('3-7d', 168), ('7d+', None)]
 
     def __init__(self):
         self.tickets = {}  # ticket_id -> Ticket
@@ -34,8 +61,57 @@ class HelpDeskSystem:
         self.standard_queue = Queue()
         self.high_priority_queue = PriorityQueue()
         self.undo_stack = Stack()
+        # Identifies this ticket store; side files check it so a reset state
+        # is not matched against another state's ticket ids
+        self.state_id = None
+        self.feed = ChangeFeed(self.EVENTS_FILE)
+        # Near-duplicate index is loaded lazily; most commands never touch it
+        self._dedup = None
+        # Agent registry is persisted; per-agent loads are counted on first use
+        self.agents: Dict[str, Agent] = {}
+        self._assigner = None
         self.load_state()  # Load on init
 
+    @property
+    def assigner(self) -> AutoAssigner:
+        if self._assigner is None:
+            self._assigner = AutoAssigner(self.agents.values())
+            self._assigner.load_from(self.tickets.values())
+        return self._assigner
+
+    def query(self, text: str, page: int = 1, page_size: Optional[int] = None, sort: str = 'default', descending: bool = False):
+        """Run a query-language expression; returns (rows, total matched, plan).
+
+        Always a full scan: each command is a new process, and building the
+        query indexes costs more than one pass over the tickets.
+        """
+        return compile_query(text).execute(self.tickets, None, page, page_size, sort, descending)
+
+    @property
+    def dedup(self) -> DedupIndex:
+        if self._dedup is None:
+            self._dedup = DedupIndex(self.DEDUP_FILE, owner=self.state_id)
+        return self._dedup
+
+    def _event(self, action: str, ticket_id: int, **extra) -> Dict[str, Any]:
+        ticket = self.tickets.get(ticket_id)
+        return {'type': action, 'ticket_id': ticket_id, 'ticket': ticket.to_dict() if ticket else None, **extra}
+
+    def _publish(self, events: List[Dict[str, Any]]) -> None:
+        # Called after save_state() so consumers never see an event whose
+        # effect is not yet persisted.
+        if self._assigner is not None:
+            for event in events:
+                self._assigner.sync(event['ticket_id'], self.tickets.get(event['ticket_id']))
+        self.feed.append(events)
+
+    def _emit(self, action: str, ticket_id: int, **extra) -> None:
+        self._publish([self._event(action, ticket_id, **extra)])
+
+    def _is_open(self, ticket_id: int) -> bool:
+        ticket = self.tickets.get(ticket_id)
+        return ticket is not None and ticket.status == 'open'
+
     # Week 2: Recursion for checking dependencies
     def is_resolvable(self, ticket_id):
         if ticket_id not in self.tickets:
@@ -48,27 +124,72 @@ class HelpDeskSystem:
             return False
         return self.is_resolvable(parent.ticket_id)
 
-    def create_ticket(self, description, priority='medium', parent_id=None):
+    def _resolvable_cached(self, ticket_id: int, memo: Dict[int, bool]) -> bool:
+        # Same rule as is_resolvable(), but ancestors shared by many tickets
+        # in a batch are only walked once.
+        if ticket_id in memo:
+            return memo[ticket_id]
+        memo[ticket_id] = False  # guards against parent cycles
+        ticket = self.tickets.get(ticket_id)
+        if ticket is None:
+            result = False
+        elif not ticket.parent_id:
+            result = True
+        else:
+            parent = self.tickets.get(ticket.parent_id)
+            result = bool(parent and parent.status == 'closed' and self._resolvable_cached(parent.ticket_id, memo))
+        memo[ticket_id] = result
+        return result
+
+    def _depth(self, ticket_id: int, memo: Dict[int, int]) -> int:
+        if ticket_id in memo:
+            return memo[ticket_id]
+        memo[ticket_id] = 0  # guards against parent cycles
+        ticket = self.tickets.get(ticket_id)
+        parent_id = ticket.parent_id if ticket else None
+        depth = self._depth(parent_id, memo) + 1 if parent_id in self.tickets else 0
+        memo[ticket_id] = depth
+        return depth
+
+    def create_ticket(self, description, priority='medium', parent_id=None, dedup=False, tags=None, auto_assign=False):
         current_user = get_current_user()
         owner_id = current_user.get('user_id') if current_user else None
+        duplicate_of = None
+        if dedup:
+            # Near-duplicates of an open canonical ticket are linked to it as
+            # children and kept out of the work queues. A duplicate that
+            # outranks its canonical is queued on its own so the escalation
+            # is not lost.
+            duplicate_of, signature = self.dedup.find(description, is_live=self._is_open)
+            if duplicate_of is not None and (
+                parent_id is not None
+                or self.PRIORITY_RANK.get(priority.lower(), 1) > self.PRIORITY_RANK.get(self.tickets[duplicate_of].priority.lower(), 1)
+            ):
+                duplicate_of = None
         ticket = Ticket(
             self.next_id,
             description,
             priority,
-            parent_id,
+            duplicate_of if duplicate_of is not None else parent_id,
             owner_user_id=owner_id,
             assigned_to_user_id=None,
-            tags=[],
+            tags=list(dict.fromkeys((tags or []) + (['dup'] if duplicate_of is not None else []))),
         )
         self.tickets[self.next_id] = ticket
         self.history.append(ticket)
-        if priority == 'high':
-            self.high_priority_queue.enqueue(ticket)
-        else:
-            self.standard_queue.enqueue(ticket)
+        if duplicate_of is None:
+            if dedup:
+                self.dedup.add(self.next_id, signature)
+            if priority == 'high':
+                self.high_priority_queue.enqueue(ticket)
+            else:
+                self.standard_queue.enqueue(ticket)
+            if auto_assign:
+                ticket.assigned_to_user_id = self.assigner.pick(ticket.tags)
         self.undo_stack.push({'action': 'create', 'ticket_id': self.next_id})
         self.next_id += 1
         self.save_state()
+        self._emit('create', ticket.ticket_id)
         return ticket
 
     def close_ticket(self, ticket_id):
@@ -77,6 +198,7 @@ class HelpDeskSystem:
             if self.is_resolvable(ticket_id) and ticket.close():
                 self.undo_stack.push({'action': 'close', 'ticket_id': ticket_id, 'prev_status': 'open'})
                 self.save_state()
+                self._emit('close', ticket_id)
                 return True
         return False
 
@@ -84,10 +206,12 @@ class HelpDeskSystem:
         if not self.high_priority_queue.is_empty():
             ticket = self.high_priority_queue.dequeue()
             self.save_state()
+            self._emit('process', ticket.ticket_id)
             return ticket
         elif not self.standard_queue.is_empty():
             ticket = self.standard_queue.dequeue()
             self.save_state()
+            self._emit('process', ticket.ticket_id)
             return ticket
         return None
 
@@ -100,6 +224,7 @@ class HelpDeskSystem:
         ticket.assigned_to_user_id = user_id
         self.undo_stack.push({'action': 'assign', 'ticket_id': ticket_id, 'prev_assigned': previous_assignee})
         self.save_state()
+        self._emit('assign', ticket_id)
         return True
 
     def tag_ticket(self, ticket_id: int, tags: List[str]) -> bool:
@@ -112,8 +237,94 @@ class HelpDeskSystem:
                 ticket.tags.append(t)
         self.undo_stack.push({'action': 'tag', 'ticket_id': ticket_id, 'prev_tags': previous_tags})
         self.save_state()
+        self._emit('tag', ticket_id)
         return True
 
+    # Bulk operations: apply every change in memory, push one grouped undo
+    # entry and persist once.
+    def _commit_batch(self, action: str, actions: List[Dict[str, Any]]) -> None:
+        if not actions:
+            return
+        self.undo_stack.push({'action': 'batch', 'actions': actions})
+        self.save_state()
+        self._publish([self._event(action, a['ticket_id']) for a in actions])
+
+    def assign_tickets(self, ticket_ids: List[int], user_id: str) -> List[int]:
+        actions = []
+        for ticket_id in ticket_ids:
+            ticket = self.tickets.get(ticket_id)
+            if not ticket:
+                continue
+            actions.append({'action': 'assign', 'ticket_id': ticket_id, 'prev_assigned': ticket.assigned_to_user_id})
+            ticket.assigned_to_user_id = user_id
+        self._commit_batch('assign', actions)
+        return [a['ticket_id'] for a in actions]
+
+    def tag_tickets(self, ticket_ids: List[int], tags: List[str]) -> List[int]:
+        actions = []
+        for ticket_id in ticket_ids:
+            ticket = self.tickets.get(ticket_id)
+            if not ticket:
+                continue
+            missing = [t for t in tags if t not in ticket.tags]
+            if not missing:
+                continue
+            actions.append({'action': 'tag', 'ticket_id': ticket_id, 'prev_tags': list(ticket.tags)})
+            ticket.tags.extend(dict.fromkeys(missing))
+        self._commit_batch('tag', actions)
+        return [a['ticket_id'] for a in actions]
+
+    def auto_assign_tickets(self, ticket_ids: List[int]) -> Dict[int, str]:
+        """Assign each open ticket to the least-loaded matching agent; one undo entry."""
+        assigner = self.assigner
+        actions = []
+        assigned: Dict[int, str] = {}
+        for ticket_id in ticket_ids:
+            ticket = self.tickets.get(ticket_id)
+            if not ticket or ticket.status != 'open':
+                continue
+            agent_id = assigner.pick(ticket.tags)
+            if agent_id is None:
+                break  # every agent is at capacity
+            actions.append({'action': 'assign', 'ticket_id': ticket_id, 'prev_assigned': ticket.assigned_to_user_id})
+            ticket.assigned_to_user_id = agent_id
+            assigner.sync(ticket_id, ticket)
+            assigned[ticket_id] = agent_id
+        self._commit_batch('assign', actions)
+        return assigned
+
+    # Agent registry
+    def register_agent(self, user_id: str, capacity: int = 10, skills: Optional[List[str]] = None) -> Agent:
+        agent = Agent(user_id, capacity, skills)
+        self.agents[user_id] = agent
+        if self._assigner is not None:
+            self._assigner.add_agent(agent)
+            self._assigner.load_from(self.tickets.values())
+        self.save_state()
+        return agent
+
+    def remove_agent(self, user_id: str) -> bool:
+        if self.agents.pop(user_id, None) is None:
+            return False
+        if self._assigner is not None:
+            self._assigner.remove_agent(user_id)
+        self.save_state()
+        return True
+
+    def close_tickets(self, ticket_ids: List[int]) -> List[int]:
+        # Parents are closed before their children so a parent and its
+        # children can be closed in the same batch.
+        depth_memo: Dict[int, int] = {}
+        ordered = sorted((tid for tid in set(ticket_ids) if tid in self.tickets), key=lambda tid: (self._depth(tid, depth_memo), tid))
+        resolvable_memo: Dict[int, bool] = {}
+        actions = []
+        for ticket_id in ordered:
+            ticket = self.tickets[ticket_id]
+            if self._resolvable_cached(ticket_id, resolvable_memo) and ticket.close():
+                actions.append({'action': 'close', 'ticket_id': ticket_id, 'prev_status': 'open'})
+        self._commit_batch('close', actions)
+        return [a['ticket_id'] for a in actions]
+
     # Week 1: Analytics dashboard using 2D list
     def analytics_dashboard(self):
         stats = [
@@ -129,8 +340,7 @@ class HelpDeskSystem:
         return stats
 
     def analytics_extended(self) -> Dict[str, Any]:
-        # SLA targets in hours by priority
-        sla_hours = {'high': 4, 'medium': 24, 'low': 72}
+        sla_hours = self.SLA_HOURS
         now = datetime.datetime.now()
 
         def ticket_age_hours(t: Ticket) -> float:
@@ -138,19 +348,16 @@ class HelpDeskSystem:
             return max(0.0, (ref - t.created_at).total_seconds() / 3600)
 
         def bucket(age_h: float) -> str:
-            if age_h < 24:
-                return '0-24h'
-            if age_h < 72:
-                return '1-3d'
-            if age_h < 168:
-                return '3-7d'
-            return '7d+'
+            for label, max_hours in self.AGING_BUCKETS:
+                if max_hours is None or age_h < max_hours:
+                    return label
+            return self.AGING_BUCKETS[-1][0]
 
         open_count = 0
         closed_count = 0
         breaches = 0
         by_priority = {'high': {'open': 0, 'closed': 0}, 'medium': {'open': 0, 'closed': 0}, 'low': {'open': 0, 'closed': 0}}
-        aging_buckets = {'0-24h': 0, '1-3d': 0, '3-7d': 0, '7d+': 0}
+        aging_buckets = {label: 0 for label, _ in self.AGING_BUCKETS}
 
         for t in self.tickets.values():
             pr = t.priority.lower()
@@ -178,10 +385,23 @@ class HelpDeskSystem:
         action = self.undo_stack.pop()
         if not action:
             return False
-        if action['action'] == 'create':
+        self._revert(action)
+        self.save_state()
+        # A null 'ticket' snapshot means the ticket no longer exists
+        undone = action['actions'] if action['action'] == 'batch' else [action]
+        self._publish([self._event('undo', a.get('ticket_id'), undone=a['action']) for a in reversed(undone)])
+        return True
+
+    def _revert(self, action: Dict[str, Any]) -> None:
+        if action['action'] == 'batch':
+            for sub_action in reversed(action['actions']):
+                self._revert(sub_action)
+        elif action['action'] == 'create':
             ticket_id = action['ticket_id']
             if ticket_id in self.tickets:
                 del self.tickets[ticket_id]
+            if self._dedup is not None or os.path.exists(self.DEDUP_FILE):
+                self.dedup.discard(ticket_id)
         elif action['action'] == 'close':
             ticket_id = action['ticket_id']
             if ticket_id in self.tickets:
@@ -200,31 +420,46 @@ class HelpDeskSystem:
             ticket_id = action['ticket_id']
             if ticket_id in self.tickets:
                 self.tickets[ticket_id].tags = action.get('prev_tags', [])
-        self.save_state()
-        return True
 
     def save_state(self):
         state = {
+            'state_id': self.state_id,
             'next_id': self.next_id,
             'tickets': {str(k): v.to_dict() for k, v in self.tickets.items()},
             'history': self.history.to_list(),
             'standard_queue': self.standard_queue.to_list(),
             'high_priority_queue': self.high_priority_queue.to_list(),
-            'undo_stack': self.undo_stack.to_list()
+            'undo_stack': self.undo_stack.to_list(),
+            'agents': [a.to_dict() for a in self.agents.values()],
         }
-        with open(self.STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=4)
+        storage.dump_json(state, self.STATE_FILE)
+        if self._dedup is not None:
+            self._dedup.commit()
+
+    def iter_tickets(self, query_text: str = ''):
+        """Yield tickets one at a time (optionally filtered by a query) for streaming exports."""
+        if not query_text:
+            yield from self.tickets.values()
+            return
+        query = compile_query(query_text)
+        if query.order or query.limit is not None:
+            yield from self.query(query_text)[0]
+            return
+        yield from query.iter_matches(self.tickets)
 
     def load_state(self):
         if os.path.exists(self.STATE_FILE):
-            with open(self.STATE_FILE, 'r') as f:
-                state = json.load(f)
+            state = storage.load_json(self.STATE_FILE)
             self.next_id = state['next_id']
             self.tickets = {int(k): Ticket.from_dict(v) for k, v in state['tickets'].items()}
             self.history = LinkedList.from_list(state['history'])
             self.standard_queue = Queue.from_list(state['standard_queue'])
             self.high_priority_queue = PriorityQueue.from_list(state['high_priority_queue'])
             self.undo_stack = Stack.from_list(state['undo_stack'])
+            self.agents = {a['user_id']: Agent.from_dict(a) for a in state.get('agents') or []}
+            self.state_id = state.get('state_id')
+        if self.state_id is None:
+            self.state_id = uuid.uuid4().hex
 
 
 def _render_table(rows):
@@ -258,6 +493,130 @@ def _render_table(rows):
     lines.append(sep_line())
     return "\n".join(lines)
 
+def _parse_id_ranges(spec: str, next_id: int) -> List[int]:
+    """Parse '1-500,612,700-710' into a list of ticket ids.
+
+    Ranges are clipped to ids that can exist (1 to next_id - 1), so a typo
+    such as '1-2000000000' costs no more than selecting every ticket.
+    """
+    ids: List[int] = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            lo, hi = (int(x) for x in part.split('-', 1))
+            if hi < lo:
+                raise ValueError(f"range {part} is reversed")
+            ids.extend(range(max(lo, 1), min(hi, next_id - 1) + 1))
+        else:
+            ids.append(int(part))
+    return ids
+
+
+def _select_ticket_ids(system: 'HelpDeskSystem', ids: Optional[str], where: Optional[str]) -> List[int]:
+    # --where uses the query language ('=' is accepted as well as ':')
+    if not where:
+        return _parse_id_ranges(ids, system.next_id)
+    rows, _, _ = system.query(where)
+    matched = [t.ticket_id for t in rows]
+    if ids:
+        wanted = set(_parse_id_ranges(ids, system.next_id))
+        matched = [tid for tid in matched if tid in wanted]
+    return matched
+
+
+def _bulk_selection_options(func):
+    func = click.option('--where', default=None, help='Select tickets by query, e.g. "assignee=alice status=open"')(func)
+    func = click.option('--ids', default=None, help='Select tickets by id list/ranges, e.g. "1-500,612"')(func)
+    return func
+
+
+def _resolve_targets(system: 'HelpDeskSystem', ticket_id: Optional[int], ids: Optional[str], where: Optional[str]) -> Optional[List[int]]:
+    if ticket_id is not None:
+        if ids or where:
+            click.echo("Use either a ticket id or --ids/--where, not both.")
+            return None
+        return [ticket_id]
+    if not ids and not where:
+        click.echo("Provide a ticket id, --ids or --where.")
+        return None
+    try:
+        return _select_ticket_ids(system, ids, where)
+    except ValueError as exc:
+        click.echo(f"Invalid selection: {exc}")
+        return None
+
+
+TICKET_HEADERS = ["ID", "Priority", "Status", "Age", "Owner", "Assignee", "Description", "Tags"]
+
+
+def _ticket_column_widths(next_id: int) -> List[int]:
+    # Widths are fixed up front (ID width from the largest possible id) so
+    # rows can be written as they are produced instead of measured first.
+    return [max(3, len(f"#{next_id}")), 8, 6, 6, 12, 12, 41, 20]
+
+
+def _fit(text: str, width: int) -> str:
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def _stream_table(headers: List[str], rows, widths: List[int]):
+    """Yield table lines one at a time using precomputed column widths."""
+    sep = "".join("+" + "-" * (w + 2) for w in widths) + "+"
+
+    def format_row(row):
+        cells = []
+        for i, w in enumerate(widths):
+            text = _fit(str(row[i]) if i < len(row) else "", w)
+            cells.append(f"| {text.ljust(w)} " if i == 0 else f"| {text.rjust(w)} ")
+        return "".join(cells) + "|"
+
+    yield sep
+    yield format_row(headers)
+    yield sep
+    for r in rows:
+        yield format_row(r)
+    yield sep
+
+
+def _echo_list(headers: List[str], rows: List[List[str]]) -> None:
+    """Print a plain list as a table; unlike _render_table, no row is set apart as a total."""
+    widths = [max(len(str(r[i])) for r in [headers] + rows) for i in range(len(headers))]
+    for line in _stream_table(headers, rows, widths):
+        click.echo(line)
+
+
+def _echo_ticket_page(system: 'HelpDeskSystem', query_text: str, page: int, page_size: int, sort: str, descending: bool, explain: bool = False):
+    rows, total, plan = system.query(query_text, page, page_size, sort, descending)
+    widths = _ticket_column_widths(system.next_id)
+    for line in _stream_table(TICKET_HEADERS, (_format_ticket_row(t) for t in rows), widths):
+        click.echo(line)
+    click.echo(f"Page {page}/{page_count(total, page_size)} ({total} tickets)")
+    if explain:
+        click.echo("\nPlan:")
+        for line in plan.describe():
+            click.echo(f"  {line}")
+
+
+def _valid_query(text: Optional[str]) -> bool:
+    try:
+        compile_query(text or '')
+        return True
+    except QueryError as exc:
+        click.echo(f"Invalid query: {exc}")
+        return False
+
+
+def _paging_options(func):
+    func = click.option('--filter', 'query_text', default='', help='Query filter, e.g. "status:open tag:vpn"')(func)
+    func = click.option('--desc', 'descending', is_flag=True, default=False, help='Reverse the sort order')(func)
+    func = click.option('--sort', default='default', type=click.Choice(sorted(SORT_KEYS)), help='Sort key')(func)
+    func = click.option('--page-size', default=DEFAULT_PAGE_SIZE, type=click.IntRange(min=1), help='Rows per page')(func)
+    func = click.option('--page', default=1, type=click.IntRange(min=1), help='Page number (1-based)')(func)
+    return func
+
+
 def _format_ticket_row(t: Ticket) -> List[str]:
     age_h = int((datetime.datetime.now() - t.created_at).total_seconds() // 3600)
     owner = t.owner_user_id or '-'
@@ -275,8 +634,10 @@ def _format_ticket_row(t: Ticket) -> List[str]:
     ]
 
 @click.group(invoke_without_command=True)
+@click.option('--as', 'profile', default=None, envvar='HELPDESK_PROFILE', help='Session profile to act as (env: HELPDESK_PROFILE)')
 @click.pass_context
-def cli(ctx):
+def cli(ctx, profile):
+    use_profile(profile)
     if ctx.invoked_subcommand is None:
         click.echo(ctx.get_help())
     else:
@@ -286,19 +647,58 @@ def cli(ctx):
 @click.option('--description', required=True, help='Ticket description')
 @click.option('--priority', default='medium', type=click.Choice(['low', 'medium', 'high'], case_sensitive=False), help='Priority level')
 @click.option('--parent', default=None, type=int, help='Parent ticket ID (optional)')
-def create(description, priority, parent):
+@click.option('--dedup', is_flag=True, default=False, help='Link near-duplicates of an open ticket instead of queueing them')
+@click.option('--tag', 'tags', multiple=True, help='Tag to add (repeatable)')
+@click.option('--auto-assign', is_flag=True, default=False, help='Assign to the least-loaded agent with a matching skill')
+def create(description, priority, parent, dedup, tags, auto_assign):
     system = HelpDeskSystem()
-    ticket = system.create_ticket(description, priority, parent)
-    click.echo(f"Created: {ticket}")
+    ticket = system.create_ticket(description, priority, parent, dedup=dedup, tags=list(tags), auto_assign=auto_assign)
+    if 'dup' in ticket.tags:
+        click.echo(f"Created: {ticket} (duplicate of #{ticket.parent_id})")
+    else:
+        click.echo(f"Created: {ticket}")
+    if auto_assign and 'dup' not in ticket.tags:
+        click.echo(f"Assigned to {ticket.assigned_to_user_id}." if ticket.assigned_to_user_id else "No agent with spare capacity.")
 
-@cli.command(help='Close a ticket')
-@click.argument('ticket_id', type=int)
-def close(ticket_id):
+@cli.command(help='Close a ticket, or many with --ids/--where')
+@click.argument('ticket_id', type=int, required=False)
+@_bulk_selection_options
+def close(ticket_id, ids, where):
     system = HelpDeskSystem()
-    if system.close_ticket(ticket_id):
-        click.echo("Ticket closed.")
-    else:
-        click.echo("Cannot close ticket.")
+    targets = _resolve_targets(system, ticket_id, ids, where)
+    if targets is None:
+        return
+    if ticket_id is not None:
+        if system.close_ticket(ticket_id):
+            click.echo("Ticket closed.")
+        else:
+            click.echo("Cannot close ticket.")
+        return
+    closed = system.close_tickets(targets)
+    click.echo(f"Closed {len(closed)} of {len(targets)} selected tickets.")
+
+@cli.command(help='List near-duplicate ticket clusters')
+@click.option('--limit', default=20, type=int, help='Maximum clusters to show')
+def dupes(limit):
+    system = HelpDeskSystem()
+    groups = dedup_clusters(system.tickets.values())
+    if not groups:
+        click.echo("No duplicate clusters.")
+        return
+    rows = []
+    for canonical_id, dup_ids in groups[:limit]:
+        canonical = system.tickets.get(canonical_id)
+        desc = canonical.description if canonical else '-'
+        ids = ",".join(f"#{i}" for i in dup_ids[:10]) + (",…" if len(dup_ids) > 10 else "")
+        rows.append([
+            f"#{canonical_id}",
+            canonical.status.capitalize() if canonical else '-',
+            str(len(dup_ids)),
+            (desc[:40] + '…') if len(desc) > 40 else desc,
+            ids,
+        ])
+    _echo_list(["Canonical", "Status", "Dupes", "Description", "Duplicate IDs"], rows)
+
 
 @cli.command(help='Process the next ticket')
 def process():
@@ -366,13 +766,98 @@ def undo():
         click.echo("No actions to undo.")
 
 
+EXPORT_FIELDS = ["ticket_id", "description", "status", "priority", "parent_id", "owner_user_id", "assigned_to_user_id", "tags", "created_at", "closed_at"]
+
+
+def _export_lines(tickets, fmt: str):
+    """Yield export text chunk by chunk so nothing is built up in memory."""
+    if fmt == 'jsonl':
+        for t in tickets:
+            yield json.dumps(t.to_dict(), separators=(',', ':'), ensure_ascii=False) + "\n"
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for t in tickets:
+        row = t.to_dict()
+        row['tags'] = ";".join(row['tags'])
+        writer.writerow([row[k] if row[k] is not None else '' for k in EXPORT_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@cli.command(help='Export tickets as JSON Lines or CSV')
+@click.option('--format', 'fmt', default='jsonl', type=click.Choice(['jsonl', 'csv']), help='Output format')
+@click.option('--compress', default=None, type=click.Choice(['gzip', 'bz2', 'xz', 'zstd']), help='Compress the output')
+@click.option('--output', '-o', default=None, help='Output file (default: stdout; a .gz/.bz2/.xz/.zst suffix implies --compress)')
+@click.option('--filter', 'query_text', default='', help='Only export tickets matching this query')
+def export(fmt, compress, output, query_text):
+    if not _valid_query(query_text):
+        return
+    if output:
+        compress = compress or storage.compression_for(output)
+        if compress and storage.compression_for(output) != compress:
+            output += storage.SUFFIXES[compress]
+    try:
+        stream = storage.open_text(output, 'w', compression=compress, newline='') if output else storage.wrap_binary(sys.stdout.buffer, compress, newline='')
+    except ValueError as exc:
+        click.echo(str(exc))
+        return
+    system = HelpDeskSystem()
+    count = 0
+
+    def counted(tickets):
+        nonlocal count
+        for t in tickets:
+            count += 1
+            yield t
+
+    try:
+        for chunk in _export_lines(counted(system.iter_tickets(query_text)), fmt):
+            stream.write(chunk)
+    finally:
+        if output or compress:
+            stream.close()
+        else:
+            stream.flush()
+            stream.detach()
+    if output:
+        click.echo(f"Exported {count} tickets to {output}.", err=True)
+
+
+@cli.command(help='Stream change events from the journal')
+@click.option('--since', default=0, type=int, help='Only events with a sequence number above this cursor')
+@click.option('--format', 'fmt', default='jsonl', type=click.Choice(['jsonl', 'text']), help='Output format')
+@click.option('--follow/--no-follow', default=True, help='Keep waiting for new events')
+@click.option('--batch-size', default=500, type=click.IntRange(min=1), help='Events read per batch')
+def watch(since, fmt, follow, batch_size):
+    feed = ChangeFeed(HelpDeskSystem.EVENTS_FILE)
+    try:
+        for batch in feed.iter_batches(since=since, batch_size=batch_size, follow=follow):
+            for event in batch:
+                if fmt == 'jsonl':
+                    click.echo(json.dumps(event, separators=(',', ':')))
+                else:
+                    extra = f" ({event['undone']})" if 'undone' in event else ""
+                    click.echo(f"{event['seq']:>8} {event['ts']} {event['type']}{extra} #{event['ticket_id']}")
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+
 @cli.command(help='Login to create a local session')
 @click.option('--user-id', required=True, help='Unique user id')
 @click.option('--name', required=True, help='Display name')
 @click.option('--role', type=click.Choice(['user', 'admin'], case_sensitive=False), default='user')
 @click.option('--email', required=False)
 def login(user_id, name, role, email):
-    session = session_login(user_id=user_id, name=name, role=role, email=email)
+    try:
+        session = session_login(user_id=user_id, name=name, role=role, email=email)
+    except ValueError as exc:
+        click.echo(f"Login failed: {exc}")
+        return
     if session:
         click.echo(f"Logged in as {session['name']} ({session['role']})")
     else:
@@ -381,7 +866,12 @@ def login(user_id, name, role, email):
 
 @cli.command(help='Logout current session')
 def logout():
-    if session_logout():
+    try:
+        logged_out = session_logout()
+    except ValueError as exc:
+        click.echo(f"Logout failed: {exc}")
+        return
+    if logged_out:
         click.echo("Logged out.")
     else:
         click.echo("No active session.")
@@ -391,62 +881,162 @@ def logout():
 def whoami():
     user = get_current_user()
     if user:
-        click.echo(f"{user['name']} ({user['user_id']}) role={user['role']}")
+        click.echo(f"{user['name']} ({user['user_id']}) role={user['role']} profile={active_profile()}")
     else:
         click.echo("Not logged in.")
 
 
-@cli.command(help='Assign a ticket to a user id')
-@click.argument('ticket_id', type=int)
+@cli.command(help='List saved session profiles')
+def profiles():
+    sessions = list_profiles()
+    if not sessions:
+        click.echo("No sessions.")
+        return
+    current = active_profile()
+    rows = []
+    for s in sessions:
+        marker = "*" if s['profile'] == current else ""
+        rows.append([f"{s['profile']}{marker}", s['user_id'], s['name'], s['role']])
+    _echo_list(["Profile", "User", "Name", "Role"], rows)
+
+
+@cli.command(help='Assign a ticket (or many with --ids/--where) to a user id')
+@click.argument('ticket_id', type=int, required=False)
 @click.option('--to', 'to_user', required=True, help='User id to assign to')
-def assign(ticket_id, to_user):
+@_bulk_selection_options
+def assign(ticket_id, to_user, ids, where):
     system = HelpDeskSystem()
-    if system.assign_ticket(ticket_id, to_user):
+    targets = _resolve_targets(system, ticket_id, ids, where)
+    if targets is None:
+        return
+    if ticket_id is None:
+        assigned = system.assign_tickets(targets, to_user)
+        click.echo(f"Assigned {len(assigned)} tickets to {to_user}.")
+    elif system.assign_ticket(ticket_id, to_user):
         click.echo(f"Assigned #{ticket_id} to {to_user}.")
     else:
         click.echo("Ticket not found.")
 
 
-@cli.command(help='Add tags to a ticket')
-@click.argument('ticket_id', type=int)
+@cli.group(help='Manage the auto-assignment agent registry')
+def agent():
+    pass
+
+
+@agent.command('add', help='Register or update an agent')
+@click.argument('user_id')
+@click.option('--capacity', default=10, type=click.IntRange(min=1), help='Maximum open tickets')
+@click.option('--skill', 'skills', multiple=True, help='Skill matched against ticket tags (repeatable)')
+def agent_add(user_id, capacity, skills):
+    system = HelpDeskSystem()
+    registered = system.register_agent(user_id, capacity, list(skills))
+    click.echo(f"Agent {registered.user_id}: capacity={registered.capacity} skills={','.join(registered.skills) or '-'}")
+
+
+@agent.command('remove', help='Remove an agent from the registry')
+@click.argument('user_id')
+def agent_remove(user_id):
+    system = HelpDeskSystem()
+    if system.remove_agent(user_id):
+        click.echo(f"Removed agent {user_id}.")
+    else:
+        click.echo("Agent not found.")
+
+
+@agent.command('list', help='Show agents with their current open load')
+def agent_list():
+    system = HelpDeskSystem()
+    if not system.agents:
+        click.echo("No agents registered.")
+        return
+    assigner = system.assigner
+    rows = []
+    for a in sorted(system.agents.values(), key=lambda a: a.user_id):
+        rows.append([a.user_id, str(assigner.load.get(a.user_id, 0)), str(a.capacity), ",".join(a.skills) or '-'])
+    _echo_list(["Agent", "Load", "Capacity", "Skills"], rows)
+
+
+@cli.command(help='Auto-assign tickets to agents by load and skill')
+@click.option('--all-unassigned', is_flag=True, default=False, help='Select every open unassigned ticket')
+@_bulk_selection_options
+def autoassign(all_unassigned, ids, where):
+    system = HelpDeskSystem()
+    if not system.agents:
+        click.echo("No agents registered. Use 'helpdesk agent add' first.")
+        return
+    if all_unassigned:
+        where = f"status:open assignee:none {where or ''}".strip()
+    targets = _resolve_targets(system, None, ids, where)
+    if targets is None:
+        return
+    assigned = system.auto_assign_tickets(targets)
+    click.echo(f"Assigned {len(assigned)} of {len(targets)} selected tickets.")
+
+
+@cli.command(help='Add tags to a ticket, or many with --ids/--where')
+@click.argument('ticket_id', type=int, required=False)
 @click.option('--add', 'tags', multiple=True, help='Tag to add (repeatable)')
-def tag(ticket_id, tags):
+@_bulk_selection_options
+def tag(ticket_id, tags, ids, where):
     if not tags:
         click.echo("Provide at least one --add tag.")
         return
     system = HelpDeskSystem()
-    if system.tag_ticket(ticket_id, list(tags)):
+    targets = _resolve_targets(system, ticket_id, ids, where)
+    if targets is None:
+        return
+    if ticket_id is None:
+        tagged = system.tag_tickets(targets, list(tags))
+        click.echo(f"Tagged {len(tagged)} tickets: {', '.join(tags)}")
+    elif system.tag_ticket(ticket_id, list(tags)):
         click.echo(f"Tagged #{ticket_id}: {', '.join(tags)}")
     else:
         click.echo("Ticket not found.")
 
 
+@cli.command(help='Query tickets, e.g. "status:open priority:high age>24h order:created desc limit:50"')
+@click.argument('expression', required=False, default='')
+@click.option('--page', default=1, type=click.IntRange(min=1), help='Page number (1-based)')
+@click.option('--page-size', default=DEFAULT_PAGE_SIZE, type=click.IntRange(min=1), help='Rows per page')
+@click.option('--explain', is_flag=True, default=False, help='Show the plan and rows examined (always a full scan here; indexes are used by tui --live)')
+def query(expression, page, page_size, explain):
+    if not _valid_query(expression):
+        return
+    system = HelpDeskSystem()
+    _echo_ticket_page(system, expression, page, page_size, 'default', False, explain=explain)
+
+
 @cli.command(help='Show your tickets and analytics')
-def my():
+@_paging_options
+def my(query_text, page, page_size, sort, descending):
     user = get_current_user()
     if not user:
         click.echo("Not logged in. Use 'helpdesk login' first.")
         return
+    if not _valid_query(query_text):
+        return
     system = HelpDeskSystem()
-    mine = [t for t in system.tickets.values() if t.owner_user_id == user['user_id'] or t.assigned_to_user_id == user['user_id']]
-    headers = ["ID", "Priority", "Status", "Age", "Owner", "Assignee", "Description", "Tags"]
-    rows = [headers] + [_format_ticket_row(t) for t in sorted(mine, key=lambda x: (x.status, x.priority, x.created_at))]
-    click.echo(_render_table(rows))
+    _echo_ticket_page(system, involving(user['user_id'], query_text), page, page_size, sort, descending)
     ext = system.analytics_extended()
     click.echo("\nAt-a-glance:")
     click.echo(_render_table([["Open", str(ext['totals']['open'])], ["Closed", str(ext['totals']['closed'])]]))
 
 
 @cli.command(help='Admin dashboard (analytics and queue health)')
-def admin():
+@_paging_options
+def admin(query_text, page, page_size, sort, descending):
     user = get_current_user()
     if not user or user.get('role') != 'admin':
         click.echo("Admin only. Login with role=admin.")
         return
+    if not _valid_query(query_text):
+        return
     system = HelpDeskSystem()
     if _HAS_UI:
-        render_admin_dashboard(system)
+        render_admin_dashboard(system, page=page, page_size=page_size, sort=sort, descending=descending, query_text=query_text)
     else:
+        _echo_ticket_page(system, query_text, page, page_size, sort, descending)
+        click.echo("")
         ext = system.analytics_extended()
         click.echo("Queue Health:")
         click.echo(_render_table([["Open", str(ext['totals']['open'])], ["Closed", str(ext['totals']['closed'])], ["Open Breaches", str(ext['sla']['open_breaches'])], ["SLA % (est)", f"{ext['sla']['sla_pct_estimate']}%"]]))
@@ -456,14 +1046,34 @@ def admin():
 
 
 @cli.command(help='Interactive UI (requires rich)')
-def tui():
-    system = HelpDeskSystem()
+@_paging_options
+@click.option('--live', is_flag=True, default=False, help='Keep the dashboard open and refresh it as the state changes')
+@click.option('--fps', default=4.0, type=click.FloatRange(min=0.1, max=30), help='Maximum redraws per second in --live mode')
+def tui(query_text, page, page_size, sort, descending, live, fps):
     user = get_current_user()
+    if not _valid_query(query_text):
+        return
+    if _HAS_UI and live:
+        run_live_dashboard(
+            HelpDeskSystem.STATE_FILE,
+            user,
+            sla_hours=HelpDeskSystem.SLA_HOURS,
+            aging_buckets=HelpDeskSystem.AGING_BUCKETS,
+            fps=fps,
+            page=page,
+            page_size=page_size,
+            sort=sort,
+            descending=descending,
+            events_file=HelpDeskSystem.EVENTS_FILE,
+            query_text=query_text,
+        )
+        return
+    system = HelpDeskSystem()
     if _HAS_UI:
         if user and user.get('role') == 'admin':
-            render_admin_dashboard(system)
+            render_admin_dashboard(system, page=page, page_size=page_size, sort=sort, descending=descending, query_text=query_text)
         else:
-            render_user_dashboard(system, user)
+            render_user_dashboard(system, user, page=page, page_size=page_size, sort=sort, descending=descending, query_text=query_text)
     else:
         click.echo("Rich UI not available. Install extras: pip install interactive-helpdesk-cli[ui]")
 
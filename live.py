@@ -0,0 +1,266 @@
+import bisect
+import datetime
+import heapq
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import storage
+from changefeed import ChangeFeed
+from pagination import SORT_KEYS
+from query import TicketIndex, compile_query
+from ticket import Ticket
+
+
+class LiveModel:
+    """In-memory ticket model for the live dashboard, updated by deltas.
+
+    Totals and per-priority counts are adjusted per changed ticket. Aging
+    buckets and SLA breaches are answered from sorted lists of open-ticket
+    creation times with bisect, so the clock moving forward never requires
+    a rescan of the backlog.
+    """
+
+    def __init__(self, sla_hours: Dict[str, int], aging_buckets: List[Tuple[str, Optional[int]]]):
+        self.sla_hours = sla_hours
+        self.aging_buckets = aging_buckets
+        self.tickets: Dict[int, Ticket] = {}
+        self._raw: Dict[int, dict] = {}
+        self.totals = {'open': 0, 'closed': 0}
+        self.by_priority = {p: {'open': 0, 'closed': 0} for p in sla_hours}
+        self._open_created: List[float] = []  # sorted timestamps of open tickets
+        self._open_created_by_priority: Dict[str, List[float]] = {p: [] for p in sla_hours}
+        # The dashboard is long-lived, so filtered views can use query indexes
+        self.index = TicketIndex()
+        # Ids touched since the last take_changed(), for LivePage
+        self.changed: Set[int] = set()
+
+    def _account(self, ticket: Ticket, sign: int) -> None:
+        pr = ticket.priority.lower()
+        state = 'open' if ticket.status == 'open' else 'closed'
+        self.totals[state] += sign
+        self.by_priority.setdefault(pr, {'open': 0, 'closed': 0})[state] += sign
+        if state != 'open':
+            return
+        ts = ticket.created_at.timestamp()
+        per_priority = self._open_created_by_priority.setdefault(pr, [])
+        if sign > 0:
+            bisect.insort(self._open_created, ts)
+            bisect.insort(per_priority, ts)
+        else:
+            del self._open_created[bisect.bisect_left(self._open_created, ts)]
+            del per_priority[bisect.bisect_left(per_priority, ts)]
+
+    def upsert(self, data: dict) -> bool:
+        ticket_id = data['ticket_id']
+        if self._raw.get(ticket_id) == data:
+            return False
+        old = self.tickets.get(ticket_id)
+        if old is not None:
+            self._account(old, -1)
+        ticket = Ticket.from_dict(data)
+        self.tickets[ticket_id] = ticket
+        self._raw[ticket_id] = data
+        self._account(ticket, +1)
+        self.index.update(ticket_id, ticket)
+        self.changed.add(ticket_id)
+        return True
+
+    def remove(self, ticket_id: int) -> bool:
+        old = self.tickets.pop(ticket_id, None)
+        if old is None:
+            return False
+        self._raw.pop(ticket_id, None)
+        self._account(old, -1)
+        self.index.update(ticket_id, None)
+        self.changed.add(ticket_id)
+        return True
+
+    def apply_state(self, tickets: Dict[str, dict]) -> int:
+        """Bring the model in line with a full `tickets` mapping; return the number of changes."""
+        changed = 0
+        seen = set()
+        for data in tickets.values():
+            seen.add(data['ticket_id'])
+            if self.upsert(data):
+                changed += 1
+        for ticket_id in [tid for tid in self.tickets if tid not in seen]:
+            self.remove(ticket_id)
+            changed += 1
+        return changed
+
+    def apply_events(self, events: List[dict]) -> int:
+        """Apply change-feed events; each carries the ticket's post-change snapshot."""
+        changed = 0
+        for event in events:
+            if event.get('ticket'):
+                changed += self.upsert(event['ticket'])
+            elif event.get('ticket_id') is not None:
+                changed += self.remove(event['ticket_id'])
+        return changed
+
+    def take_changed(self) -> Set[int]:
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def analytics(self, now: Optional[datetime.datetime] = None) -> dict:
+        """Same shape as HelpDeskSystem.analytics_extended()."""
+        now_ts = (now or datetime.datetime.now()).timestamp()
+        aging = {}
+        newer_than_prev = 0
+        for label, max_hours in self.aging_buckets:
+            if max_hours is None:
+                aging[label] = len(self._open_created) - newer_than_prev
+                continue
+            newer = len(self._open_created) - bisect.bisect_right(self._open_created, now_ts - max_hours * 3600)
+            aging[label] = newer - newer_than_prev
+            newer_than_prev = newer
+        breaches = 0
+        for pr, created in self._open_created_by_priority.items():
+            limit = self.sla_hours.get(pr, 24)
+            breaches += bisect.bisect_left(created, now_ts - limit * 3600)
+        open_count = self.totals['open']
+        closed_count = self.totals['closed']
+        sla_pct = 0 if (open_count == 0 and closed_count == 0) else int(round(100 * (1 - (breaches / (open_count or 1))), 0))
+        return {
+            'totals': dict(self.totals),
+            'by_priority': {k: dict(v) for k, v in self.by_priority.items()},
+            'aging_buckets': aging,
+            'sla': {'targets_h': self.sla_hours, 'open_breaches': breaches, 'sla_pct_estimate': sla_pct},
+        }
+
+
+class _Reversed:
+    """Inverts the ordering of a sort key so descending pages can use bisect."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __lt__(self, other: '_Reversed') -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and self.key == other.key
+
+
+class LivePage:
+    """One page of a live query, kept current from changed tickets only.
+
+    Holds the ids matching the query plus the best 2 * page * page_size of
+    them in sort order. A change re-tests just that ticket and adjusts the
+    buffer with bisect; the backlog is only re-evaluated when removals drain
+    the buffer below the page, or on refresh() so relative terms such as
+    age>24h follow the clock. Ties are broken by ticket id.
+    """
+
+    def __init__(self, query_text: str, page: int, page_size: int, sort: str = 'default', descending: bool = False):
+        self.query = compile_query(query_text)
+        self.page = max(1, page)
+        self.page_size = max(1, page_size)
+        self._key = SORT_KEYS[self.query.order or sort]
+        self._descending = self.query.descending if self.query.order else descending
+        self._wanted = self.page * self.page_size
+        if self.query.limit is not None:
+            self._wanted = min(self._wanted, self.query.limit)
+        self._capacity = 2 * self._wanted
+        self.matched: Set[int] = set()
+        self._top: List[Any] = []  # sort entries, best first
+        self._entries: Dict[int, Any] = {}  # ticket id -> entry, for tickets in _top
+        self._complete = True  # _top holds every match
+
+    def _entry(self, ticket: Ticket) -> Any:
+        key = (self._key(ticket), ticket.ticket_id)
+        return _Reversed(key) if self._descending else key
+
+    def refresh(self, model: LiveModel) -> None:
+        """Re-evaluate the query over the whole model."""
+        self.query = compile_query(self.query.text)
+        matches = list(self.query.iter_matches(model.tickets, model.index))
+        self.matched = {t.ticket_id for t in matches}
+        best = heapq.nsmallest(self._capacity, ((self._entry(t), t.ticket_id) for t in matches))
+        self._top = [entry for entry, _ in best]
+        self._entries = {tid: entry for entry, tid in best}
+        self._complete = len(self._top) == len(self.matched)
+
+    def update(self, model: LiveModel, ticket_ids: Set[int]) -> None:
+        """Re-test `ticket_ids` against the query and adjust the page."""
+        for tid in ticket_ids:
+            entry = self._entries.pop(tid, None)
+            if entry is not None:
+                del self._top[bisect.bisect_left(self._top, entry)]
+            ticket = model.tickets.get(tid)
+            if ticket is None or not self.query.matches(ticket):
+                self.matched.discard(tid)
+                continue
+            self.matched.add(tid)
+            entry = self._entry(ticket)
+            if not self._complete and not (self._top and entry < self._top[-1]):
+                continue  # sorts after the buffer, like the matches left out of it
+            bisect.insort(self._top, entry)
+            self._entries[tid] = entry
+            if len(self._top) > self._capacity:
+                dropped = self._top.pop()
+                del self._entries[dropped.key[1] if self._descending else dropped[1]]
+                self._complete = False
+        if not self._complete and len(self._top) < self._wanted:
+            self.refresh(model)
+
+    def rows(self, model: LiveModel) -> Tuple[List[Ticket], int]:
+        """Return (tickets on the page, total matched) like Query.execute()."""
+        window = self._top[(self.page - 1) * self.page_size:self._wanted]
+        rows = [model.tickets[entry.key[1] if self._descending else entry[1]] for entry in window]
+        total = len(self.matched)
+        if self.query.limit is not None:
+            total = min(total, self.query.limit)
+        return rows, total
+
+
+class StateWatcher:
+    """Detects changes to the state file by (mtime, size) without reading it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature = None
+
+    def poll(self) -> Optional[dict]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        try:
+            return storage.load_json(self.path)
+        except (OSError, EOFError, ValueError):
+            # Caught mid-write; retry on the next poll.
+            self._signature = None
+            return None
+
+
+class FeedWatcher:
+    """Tails the change feed from a cursor, touching the file only when it changes."""
+
+    def __init__(self, feed: ChangeFeed, since: int):
+        self.feed = feed
+        self.since = since
+        self._offset = None
+        self._stat = None
+
+    def poll(self, limit: int = 1000) -> List[dict]:
+        try:
+            st = os.stat(self.feed.path)
+        except OSError:
+            return []
+        # mtime too: dropping a partial tail and appending can leave the size unchanged
+        stat = (st.st_size, st.st_mtime_ns)
+        if stat == self._stat:
+            return []
+        events, self._offset = self.feed.read(self.since, limit, self._offset)
+        if events:
+            self.since = events[-1]['seq']
+        if len(events) < limit:
+            self._stat = stat
+        return events
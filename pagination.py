@@ -0,0 +1,60 @@
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ticket import Ticket
+
+_PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+# Sort keys available to the dashboards. 'default' is the historical
+# (status, priority, created_at) ordering.
+SORT_KEYS: Dict[str, Callable[[Ticket], tuple]] = {
+    'default': lambda t: (t.status, t.priority, t.created_at),
+    'created': lambda t: (t.created_at, t.ticket_id),
+    'priority': lambda t: (_PRIORITY_RANK.get(t.priority.lower(), 3), t.created_at),
+    'status': lambda t: (t.status, t.ticket_id),
+    'id': lambda t: (t.ticket_id,),
+}
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class _Counter:
+    """Wraps an iterable and counts the items pulled through it."""
+
+    def __init__(self, items: Iterable):
+        self._items = items
+        self.count = 0
+
+    def __iter__(self):
+        for item in self._items:
+            self.count += 1
+            yield item
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+
+def select_page(
+    tickets: Iterable[Ticket],
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sort: str = 'default',
+    descending: bool = False,
+    limit: Optional[int] = None,
+) -> Tuple[List[Ticket], int]:
+    """Return (tickets on `page`, total matched) without fully sorting.
+
+    Only the first page * page_size tickets are kept on a heap, so memory
+    is bounded by the requested page rather than by the ticket count.
+    `limit` caps the total to the first `limit` tickets in sort order.
+    """
+    page = max(1, page)
+    page_size = max(1, page_size)
+    key = SORT_KEYS[sort]
+    counted = _Counter(tickets)
+    select = heapq.nlargest if descending else heapq.nsmallest
+    wanted = page * page_size if limit is None else min(page * page_size, limit)
+    top = select(wanted, counted, key=key)
+    total = counted.count if limit is None else min(counted.count, limit)
+    return top[(page - 1) * page_size:], total
@@ -0,0 +1,360 @@
+import bisect
+import datetime
+import re
+import shlex
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ticket import Ticket
+from pagination import SORT_KEYS, select_page
+
+
+# Equality fields backed by a hash index: field -> getter returning the indexed values
+_EQ_INDEXED: Dict[str, Callable[[Ticket], Iterable[Any]]] = {
+    'status': lambda t: (t.status.lower(),),
+    'priority': lambda t: (t.priority.lower(),),
+    'owner': lambda t: (t.owner_user_id,),
+    'assignee': lambda t: (t.assigned_to_user_id,),
+    'tag': lambda t: t.tags,
+    'parent': lambda t: (t.parent_id,),
+}
+_CASE_INSENSITIVE = {'status', 'priority'}
+_RANGE_FIELDS = {'age', 'created', 'id'}
+_DURATION_RE = re.compile(r'^(\d+(?:\.\d+)?)([smhdw]?)$')
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, '': 3600}
+
+
+class QueryError(ValueError):
+    pass
+
+
+class TicketIndex:
+    """Secondary indexes over tickets, maintained incrementally.
+
+    Equality indexes map a value to the set of ticket ids holding it; the
+    creation-time index is a sorted list of (timestamp, ticket_id) pairs
+    searched with bisect.
+    """
+
+    def __init__(self, tickets: Optional[Dict[int, Ticket]] = None):
+        self.eq: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in _EQ_INDEXED}
+        self.created: List[Tuple[float, int]] = []
+        self.max_id = 0
+        self._entries: Dict[int, Tuple[Dict[str, Tuple[Any, ...]], float]] = {}
+        for ticket in (tickets or {}).values():
+            self._add(ticket)
+        self.created.sort()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, ticket: Ticket, keep_sorted: bool = False) -> None:
+        values = {field: tuple(getter(ticket)) for field, getter in _EQ_INDEXED.items()}
+        for field, vals in values.items():
+            for v in vals:
+                self.eq[field].setdefault(v, set()).add(ticket.ticket_id)
+        entry = (ticket.created_at.timestamp(), ticket.ticket_id)
+        if keep_sorted:
+            bisect.insort(self.created, entry)
+        else:
+            self.created.append(entry)
+        self._entries[ticket.ticket_id] = (values, entry[0])
+        self.max_id = max(self.max_id, ticket.ticket_id)
+
+    def _remove(self, ticket_id: int) -> None:
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return
+        values, created_ts = entry
+        for field, vals in values.items():
+            for v in vals:
+                bucket = self.eq[field].get(v)
+                if bucket is not None:
+                    bucket.discard(ticket_id)
+                    if not bucket:
+                        del self.eq[field][v]
+        pos = bisect.bisect_left(self.created, (created_ts, ticket_id))
+        if pos < len(self.created) and self.created[pos] == (created_ts, ticket_id):
+            del self.created[pos]
+
+    def update(self, ticket_id: int, ticket: Optional[Ticket]) -> None:
+        """Re-index `ticket_id`; pass None when the ticket was deleted."""
+        self._remove(ticket_id)
+        if ticket is not None:
+            self._add(ticket, keep_sorted=True)
+
+    def created_range(self, lo: Optional[float], hi: Optional[float], inclusive: bool = False) -> Tuple[int, int]:
+        """Positions in `created` for lo < created_at < hi (<= with `inclusive`)."""
+        if lo is None:
+            start = 0
+        elif inclusive:
+            start = bisect.bisect_left(self.created, (lo, float('-inf')))
+        else:
+            start = bisect.bisect_right(self.created, (lo, float('inf')))
+        if hi is None:
+            end = len(self.created)
+        elif inclusive:
+            end = bisect.bisect_right(self.created, (hi, float('inf')))
+        else:
+            end = bisect.bisect_left(self.created, (hi, float('-inf')))
+        return start, max(start, end)
+
+
+class Term:
+    """One compiled filter term: a predicate plus what an index can do with it."""
+
+    def __init__(self, field: str, op: str, value: Any, text: str):
+        self.field = field
+        self.op = op
+        self.value = value
+        self.text = text
+        self.inclusive = op in ('>=', '<=')
+        self.predicate = self._compile()
+
+    def _compile(self) -> Callable[[Ticket], bool]:
+        field, op, value = self.field, self.op, self.value
+        if field == 'text':
+            needle = value.lower()
+            return lambda t: needle in t.description.lower()
+        if field == 'involves':
+            return lambda t: t.owner_user_id == value or t.assigned_to_user_id == value
+        if field in _EQ_INDEXED:
+            getter = _EQ_INDEXED[field]
+            return lambda t: value in getter(t)
+        if field == 'id':
+            return _compare(lambda t: t.ticket_id, op, value)
+        # age and created both reduce to one bound on created_at
+        lo, hi = self.created_bounds()
+        if lo is not None:
+            return _compare(lambda t: t.created_at.timestamp(), '>=' if self.inclusive else '>', lo)
+        return _compare(lambda t: t.created_at.timestamp(), '<=' if self.inclusive else '<', hi)
+
+    def created_bounds(self, now: Optional[float] = None) -> Tuple[Optional[float], Optional[float]]:
+        if self.field == 'created':
+            return (self.value, None) if self.op in ('>', '>=') else (None, self.value)
+        now = datetime.datetime.now().timestamp() if now is None else now
+        cutoff = now - self.value
+        # older than (age>) means created before the cutoff
+        return (None, cutoff) if self.op in ('>', '>=') else (cutoff, None)
+
+    def _id_range(self, index: TicketIndex) -> range:
+        value = self.value
+        lo = {'>': value + 1, '>=': value}.get(self.op, 1)
+        hi = {'<': value - 1, '<=': value}.get(self.op, index.max_id)
+        if self.op == ':':
+            lo = hi = value
+        return range(max(lo, 1), min(hi, index.max_id) + 1)
+
+    def estimate(self, index: TicketIndex) -> Optional[int]:
+        """Rows an index scan would yield for this term, or None if not indexable."""
+        if self.field == 'id':
+            return len(self._id_range(index))
+        if self.field in _EQ_INDEXED:
+            return len(index.eq[self.field].get(self.value, ()))
+        if self.field == 'involves':
+            return len(index.eq['owner'].get(self.value, ())) + len(index.eq['assignee'].get(self.value, ()))
+        if self.field in ('age', 'created'):
+            start, end = index.created_range(*self.created_bounds(), inclusive=self.inclusive)
+            return end - start
+        return None
+
+    def candidates(self, index: TicketIndex) -> Iterable[int]:
+        if self.field == 'id':
+            return self._id_range(index)
+        if self.field in _EQ_INDEXED:
+            return index.eq[self.field].get(self.value, set())
+        if self.field == 'involves':
+            return index.eq['owner'].get(self.value, set()) | index.eq['assignee'].get(self.value, set())
+        start, end = index.created_range(*self.created_bounds(), inclusive=self.inclusive)
+        return (ticket_id for _, ticket_id in index.created[start:end])
+
+
+def _compare(getter, op, value):
+    if op == '>':
+        return lambda t: getter(t) > value
+    if op == '>=':
+        return lambda t: getter(t) >= value
+    if op == '<':
+        return lambda t: getter(t) < value
+    if op == '<=':
+        return lambda t: getter(t) <= value
+    return lambda t: getter(t) == value
+
+
+def _parse_duration(text: str) -> float:
+    m = _DURATION_RE.match(text.lower())
+    if not m:
+        raise QueryError(f"Invalid duration: {text}")
+    return float(m.group(1)) * _DURATION_UNITS[m.group(2)]
+
+
+def _parse_value(field: str, op: str, raw: str) -> Any:
+    if field == 'age':
+        return _parse_duration(raw)
+    if field == 'created':
+        try:
+            return datetime.datetime.fromisoformat(raw).timestamp()
+        except ValueError:
+            raise QueryError(f"Invalid date: {raw}")
+    if field in ('id', 'parent'):
+        if field == 'parent' and raw.lower() in ('none', '-'):
+            return None
+        try:
+            return int(raw.lstrip('#'))
+        except ValueError:
+            raise QueryError(f"Invalid {field}: {raw}")
+    if raw.lower() in ('none', '-') and field in ('owner', 'assignee', 'involves'):
+        return None
+    return raw.lower() if field in _CASE_INSENSITIVE else raw
+
+
+class Plan:
+    def __init__(self, access: str, term: Optional[Term], estimate: int):
+        self.access = access  # 'index' or 'scan'
+        self.term = term
+        self.estimate = estimate
+        self.examined = 0
+        self.matched = 0
+
+    def describe(self) -> List[str]:
+        if self.term is None:
+            lines = [f"full scan (est {self.estimate} rows)"]
+        else:
+            index_name = {'age': 'created', 'involves': 'owner+assignee'}.get(self.term.field, self.term.field)
+            lines = [f"index scan on {index_name} for {self.term.text} (est {self.estimate} rows)"]
+        lines.append(f"rows examined: {self.examined}")
+        lines.append(f"rows matched: {self.matched}")
+        return lines
+
+
+class Query:
+    def __init__(self, terms: List[Term], order: Optional[str], descending: bool, limit: Optional[int], text: str):
+        self.terms = terms
+        self.order = order
+        self.descending = descending
+        self.limit = limit
+        self.text = text
+
+    def matches(self, ticket: Ticket) -> bool:
+        return all(term.predicate(ticket) for term in self.terms)
+
+    def plan(self, index: Optional[TicketIndex], tickets: Dict[int, Ticket]) -> Plan:
+        # Building an index costs far more than one scan, so without a
+        # prebuilt one (one-shot CLI commands) the plan is always a scan.
+        if index is None:
+            return Plan('scan', None, len(tickets))
+        best: Optional[Tuple[int, Term]] = None
+        for term in self.terms:
+            est = term.estimate(index)
+            if est is not None and (best is None or est < best[0]):
+                best = (est, term)
+        # An index is only worth it if it narrows the scan
+        if best is None or best[0] >= len(tickets):
+            return Plan('scan', None, len(tickets))
+        return Plan('index', best[1], best[0])
+
+    def iter_matches(
+        self,
+        tickets: Dict[int, Ticket],
+        index: Optional[TicketIndex] = None,
+        plan: Optional[Plan] = None,
+    ) -> Iterator[Ticket]:
+        """Yield matching tickets unsorted, one at a time, counting into `plan`."""
+        plan = plan or self.plan(index, tickets)
+        residual = [term.predicate for term in self.terms if term is not plan.term]
+        if plan.term is None:
+            source: Iterable[Ticket] = tickets.values()
+        else:
+            source = (tickets[tid] for tid in plan.term.candidates(index) if tid in tickets)
+        for t in source:
+            plan.examined += 1
+            if all(p(t) for p in residual):
+                plan.matched += 1
+                yield t
+
+    def execute(
+        self,
+        tickets: Dict[int, Ticket],
+        index: Optional[TicketIndex] = None,
+        page: int = 1,
+        page_size: Optional[int] = None,
+        sort: str = 'default',
+        descending: bool = False,
+    ) -> Tuple[List[Ticket], int, Plan]:
+        """Return (rows for the page, total matched, plan with counters).
+
+        `sort`/`descending` apply only when the query has no order: term.
+        A limit: term caps the total; `page_size` (or the limit) sets the page.
+        """
+        plan = self.plan(index, tickets)
+        matches = self.iter_matches(tickets, index, plan)
+
+        order = self.order or sort
+        desc = self.descending if self.order else descending
+        size = page_size or self.limit
+        if size is None:
+            rows = list(matches)
+            if self.order or sort != 'default' or desc:
+                rows.sort(key=SORT_KEYS[order], reverse=desc)
+            return rows, len(rows), plan
+        rows, total = select_page(matches, page, size, order, desc, limit=self.limit)
+        return rows, total, plan
+
+
+def involving(user_id: Optional[str], text: str = '') -> str:
+    """Query text for tickets a user owns or is assigned, plus extra terms."""
+    return f"involves:{shlex.quote(user_id) if user_id else 'none'} {text or ''}".strip()
+
+
+def compile_query(text: str) -> Query:
+    """Compile a query such as 'status:open priority:high tag:vpn age>24h order:created desc limit:50'."""
+    try:
+        tokens = shlex.split(text or '')
+    except ValueError as exc:
+        raise QueryError(str(exc))
+    terms: List[Term] = []
+    order: Optional[str] = None
+    descending = False
+    limit: Optional[int] = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        match = re.match(r'^([A-Za-z_]+)(>=|<=|>|<|:|=)(.*)$', token)
+        if not match:
+            terms.append(Term('text', ':', token, token))
+            continue
+        field, op, raw = match.group(1).lower(), match.group(2), match.group(3)
+        if field == 'order':
+            name, _, direction = raw.partition(':')
+            name = {'age': 'created'}.get(name.lower(), name.lower())
+            if name not in SORT_KEYS:
+                raise QueryError(f"Unknown order field: {raw}")
+            order = name
+            if not direction and i < len(tokens) and tokens[i].lower() in ('asc', 'desc'):
+                direction = tokens[i]
+                i += 1
+            descending = direction.lower() == 'desc'
+            continue
+        if field == 'limit':
+            try:
+                limit = int(raw)
+            except ValueError:
+                raise QueryError(f"Invalid limit: {raw}")
+            if limit < 0:
+                raise QueryError(f"Invalid limit: {raw}")
+            continue
+        if field == 'text':
+            terms.append(Term('text', ':', raw, token))
+            continue
+        if field not in _EQ_INDEXED and field not in _RANGE_FIELDS and field != 'involves':
+            raise QueryError(f"Unknown field: {field}")
+        if op in ('>', '<', '>=', '<=') and field not in _RANGE_FIELDS:
+            raise QueryError(f"Field {field} does not support {op}")
+        if op == '=':
+            op = ':'
+        if field in ('age', 'created') and op == ':':
+            raise QueryError(f"{field} needs > or <, e.g. age>24h or created>2025-08-01")
+        if not raw:
+            raise QueryError(f"Missing value in: {token}")
+        terms.append(Term(field, op, _parse_value(field, op, raw), token))
+    return Query(terms, order, descending, limit, text)
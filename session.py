@@ -1,9 +1,26 @@
 import json
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
+import storage
 
+try:
+    import fcntl  # POSIX only; serializes read-modify-write of the store
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# All named sessions (profiles) live in one store keyed by profile name:
+# {"default": "<profile>", "profiles": {"<profile>": {session}, ...}}
+SESSION_STORE = os.environ.get("HELPDESK_SESSION_STORE", "helpdesk_sessions.json")
+# Single-session file used before profiles existed; read as a fallback and
+# folded into the store on the next write.
 SESSION_FILE = "helpdesk_session.json"
+PROFILE_ENV = "HELPDESK_PROFILE"
+
+# Parsed store cached for the life of the process, keyed by (path, mtime, size)
+_cache: Dict[str, Any] = {"signature": None, "store": None}
+_selected_profile: Optional[str] = None
 
 
 def _read_file(path: str) -> Optional[Dict[str, Any]]:
@@ -16,13 +33,102 @@ def _read_file(path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _write_file(path: str, data: Dict[str, Any]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+def _empty_store() -> Dict[str, Any]:
+    return {"default": None, "profiles": {}}
+
+
+def _from_legacy() -> Dict[str, Any]:
+    store = _empty_store()
+    legacy = _read_file(SESSION_FILE)
+    if legacy and legacy.get("user_id"):
+        store["profiles"][legacy["user_id"]] = legacy
+        store["default"] = legacy["user_id"]
+    return store
+
+
+def _load_store() -> Dict[str, Any]:
+    # Only a stat() when nothing changed; the file is re-parsed when its
+    # mtime or size moves (e.g. another process logged in).
+    try:
+        st = os.stat(SESSION_STORE)
+        signature = (SESSION_STORE, st.st_mtime_ns, st.st_size)
+    except OSError:
+        try:
+            st = os.stat(SESSION_FILE)
+            signature = (SESSION_FILE, st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+    if signature is not None and signature == _cache["signature"]:
+        return _cache["store"]
+    if signature is None:
+        store = _empty_store()
+    elif signature[0] == SESSION_STORE:
+        store = _read_file(SESSION_STORE) or _empty_store()
+        store.setdefault("profiles", {})
+    else:
+        store = _from_legacy()
+    _cache["signature"] = signature
+    _cache["store"] = store
+    return store
+
+
+def _update_store(mutate) -> Any:
+    """Apply `mutate(store)` under an exclusive lock and persist the result.
+
+    Raises ValueError, leaving the file untouched, if the store exists but
+    cannot be parsed.
+    """
+    lock_path = SESSION_STORE + ".lock"
+    with open(lock_path, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            migrating = not os.path.exists(SESSION_STORE)
+            store = _from_legacy() if migrating else _read_file(SESSION_STORE)
+            if not isinstance(store, dict):
+                # Rewriting it would drop every saved profile
+                raise ValueError(f"{SESSION_STORE} is not a readable session store; repair or move it aside")
+            store.setdefault("profiles", {})
+            result = mutate(store)
+            storage.dump_json(store, SESSION_STORE)
+            _cache["signature"] = None  # re-stat on next read
+            if migrating and os.path.exists(SESSION_FILE):
+                # The legacy session is now part of the store
+                try:
+                    os.remove(SESSION_FILE)
+                except OSError:
+                    pass
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return result
+
+
+def use_profile(name: Optional[str]) -> None:
+    """Select the profile for this process (e.g. from `--as`); overrides the env var."""
+    global _selected_profile
+    _selected_profile = name or None
+
+
+def _requested_profile() -> Optional[str]:
+    return _selected_profile or os.environ.get(PROFILE_ENV) or None
+
+
+def active_profile() -> Optional[str]:
+    return _requested_profile() or _load_store().get("default")
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    store = _load_store()
+    return [dict(session, profile=name) for name, session in sorted(store["profiles"].items())]
 
 
 def get_current_user() -> Optional[Dict[str, Any]]:
-    return _read_file(SESSION_FILE)
+    store = _load_store()
+    profile = _requested_profile() or store.get("default")
+    if not profile:
+        return None
+    return store["profiles"].get(profile)
 
 
 def login(user_id: str, name: str, role: str = "user", email: Optional[str] = None) -> Dict[str, Any]:
@@ -30,17 +136,31 @@ def login(user_id: str, name: str, role: str = "user", email: Optional[str] = No
     if role not in {"user", "admin"}:
         role = "user"
     session = {"user_id": user_id, "name": name, "role": role, "email": email}
-    _write_file(SESSION_FILE, session)
+    requested = _requested_profile()
+
+    def mutate(store):
+        profile = requested or user_id
+        store["profiles"][profile] = session
+        if not requested:
+            # Plain `helpdesk login` also makes this the machine default
+            store["default"] = profile
+
+    _update_store(mutate)
     return session
 
 
 def logout() -> bool:
-    if os.path.exists(SESSION_FILE):
-        try:
-            os.remove(SESSION_FILE)
-            return True
-        except Exception:
-            return False
-    return False
+    requested = _requested_profile()
 
+    def mutate(store):
+        profile = requested or store.get("default")
+        if not profile or profile not in store["profiles"]:
+            return False
+        del store["profiles"][profile]
+        if store.get("default") == profile:
+            store["default"] = None
+        return True
 
+    if get_current_user() is None:
+        return False
+    return _update_store(mutate)
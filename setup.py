@@ -39,7 +39,7 @@ setup(
         "Topic :: Utilities",
     ],
     # We ship individual modules (flat files), not a package directory
-    py_modules=["helpdesk", "LinkedList", "Stack", "ticket", "session", "ui"],
+    py_modules=["helpdesk", "LinkedList", "Stack", "ticket", "session", "ui", "dedup", "pagination", "live", "changefeed", "query", "assigner", "storage"],
     entry_points={
         "console_scripts": [
             "helpdesk=helpdesk:cli",
@@ -0,0 +1,90 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+from typing import Any, Optional
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:  # pragma: no cover - depends on interpreter version
+    _zstd = None
+
+
+# File extension -> compression name; anything else is stored uncompressed
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.lzma': 'xz', '.zst': 'zstd'}
+SUFFIXES = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst'}
+
+
+def compression_for(path: str) -> Optional[str]:
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def available_compressions() -> list:
+    return [name for name in SUFFIXES if name != 'zstd' or _zstd is not None]
+
+
+def _module(compression: str):
+    if compression == 'gzip':
+        return gzip
+    if compression == 'bz2':
+        return bz2
+    if compression == 'xz':
+        return lzma
+    if compression == 'zstd':
+        if _zstd is None:
+            raise ValueError("zstd compression requires Python 3.14 or newer")
+        return _zstd
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def open_text(path: str, mode: str = 'r', compression: Optional[str] = None, newline: Optional[str] = None):
+    """Open `path` as text, compressing transparently based on its extension."""
+    compression = compression or compression_for(path)
+    if compression is None:
+        return open(path, mode, encoding='utf-8', newline=newline)
+    text_mode = mode if 't' in mode else mode + 't'
+    # The state is rewritten on every mutation, so writes use faster levels
+    # than the library defaults; the size cost is a few percent.
+    if compression == 'gzip':
+        return gzip.open(path, text_mode, compresslevel=6, encoding='utf-8', newline=newline)
+    if compression == 'xz' and 'r' not in mode:
+        return lzma.open(path, text_mode, preset=1, encoding='utf-8', newline=newline)
+    return _module(compression).open(path, text_mode, encoding='utf-8', newline=newline)
+
+
+def wrap_binary(stream, compression: Optional[str], newline: Optional[str] = None):
+    """Text writer over a binary stream (e.g. stdout), optionally compressed."""
+    if compression is None:
+        return io.TextIOWrapper(stream, encoding='utf-8', newline=newline, write_through=True)
+    if compression == 'gzip':
+        raw = gzip.GzipFile(fileobj=stream, mode='wb')
+    elif compression == 'bz2':
+        raw = bz2.BZ2File(stream, 'wb')
+    elif compression == 'xz':
+        raw = lzma.LZMAFile(stream, 'wb')
+    else:
+        raw = _module(compression).ZstdFile(stream, 'wb')
+    return io.TextIOWrapper(raw, encoding='utf-8', newline=newline)
+
+
+def dump_json(data: Any, path: str) -> None:
+    """Write compact JSON atomically (temp file + rename) so readers never see a partial file."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        # json.dumps encodes in one C call; json.dump streams through the
+        # slower pure-Python iterencode
+        payload = json.dumps(data, separators=(',', ':'))
+        with open_text(tmp_path, 'w', compression=compression_for(path)) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_json(path: str) -> Any:
+    with open_text(path, 'r') as f:
+        return json.load(f)
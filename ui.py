@@ -1,11 +1,17 @@
-from typing import Optional, TYPE_CHECKING
-from rich.console import Console
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from rich.console import Console, Group
+from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
 from rich.columns import Columns
 from rich import box
 
 from ticket import Ticket
+from pagination import DEFAULT_PAGE_SIZE, page_count
+from changefeed import ChangeFeed
+from live import LiveModel, LivePage, StateWatcher, FeedWatcher
+from query import involving
 if TYPE_CHECKING:  # avoid runtime import cycle
     from helpdesk import HelpDeskSystem  # pragma: no cover
 
@@ -13,8 +19,8 @@ if TYPE_CHECKING:  # avoid runtime import cycle
 console = Console()
 
 
-def _ticket_table(tickets):
-    table = Table(title="Tickets", box=box.SIMPLE_HEAVY)
+def _ticket_table(tickets, caption: Optional[str] = None):
+    table = Table(title="Tickets", caption=caption, box=box.SIMPLE_HEAVY)
     table.add_column("ID", justify="right")
     table.add_column("Priority")
     table.add_column("Status")
@@ -38,8 +44,7 @@ def _ticket_table(tickets):
     return table
 
 
-def _analytics_panels(system: 'HelpDeskSystem'):
-    ext = system.analytics_extended()
+def _analytics_panels(ext: dict):
     totals = Table(title="Totals", box=box.MINIMAL_DOUBLE_HEAD)
     totals.add_column("Metric")
     totals.add_column("Value", justify="right")
@@ -61,21 +66,108 @@ def _analytics_panels(system: 'HelpDeskSystem'):
     return Columns([Panel(totals, title=""), Panel(sla, title=""), Panel(aging, title="")])
 
 
-def render_user_dashboard(system: 'HelpDeskSystem', user: Optional[dict]):
+def _query_page_table(system: 'HelpDeskSystem', query_text: str, page: int, page_size: int, sort: str, descending: bool):
+    rows, total, _ = system.query(query_text, page, page_size, sort, descending)
+    return _ticket_table(rows, caption=f"Page {page}/{page_count(total, page_size)} ({total} tickets)")
+
+
+def render_user_dashboard(
+    system: 'HelpDeskSystem',
+    user: Optional[dict],
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sort: str = 'default',
+    descending: bool = False,
+    query_text: str = '',
+):
     console.rule("HelpDesk — User Dashboard")
     current_user_id = user['user_id'] if user else None
-    mine = [t for t in system.tickets.values() if (t.owner_user_id == current_user_id) or (t.assigned_to_user_id == current_user_id)]
-    mine_sorted = sorted(mine, key=lambda x: (x.status, x.priority, x.created_at))
-    console.print(_ticket_table(mine_sorted))
-    console.print(_analytics_panels(system))
+    console.print(_query_page_table(system, involving(current_user_id, query_text), page, page_size, sort, descending))
+    console.print(_analytics_panels(system.analytics_extended()))
     console.print(Panel("Commands: helpdesk create | assign | tag | close | analytics | history", title="Hints"))
 
 
-def render_admin_dashboard(system: 'HelpDeskSystem'):
+def render_admin_dashboard(
+    system: 'HelpDeskSystem',
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sort: str = 'default',
+    descending: bool = False,
+    query_text: str = '',
+):
     console.rule("HelpDesk — Admin Dashboard")
-    all_sorted = sorted(system.tickets.values(), key=lambda x: (x.status, x.priority, x.created_at))
-    console.print(_ticket_table(all_sorted))
-    console.print(_analytics_panels(system))
+    console.print(_query_page_table(system, query_text, page, page_size, sort, descending))
+    console.print(_analytics_panels(system.analytics_extended()))
     console.print(Panel("Commands: helpdesk admin | analytics | process | assign | tag | undo", title="Hints"))
 
 
+def _live_view(model: LiveModel, view: LivePage, title: str):
+    rows, total = view.rows(model)
+    return Group(
+        Panel(f"Updated {time.strftime('%H:%M:%S')} — Ctrl+C to exit", title=title),
+        _ticket_table(rows, caption=f"Page {view.page}/{page_count(total, view.page_size)} ({total} tickets)"),
+        _analytics_panels(model.analytics()),
+    )
+
+
+def run_live_dashboard(
+    state_file: str,
+    user: Optional[dict],
+    sla_hours: Dict[str, int],
+    aging_buckets: List[Tuple[str, Optional[int]]],
+    fps: float = 4.0,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sort: str = 'default',
+    descending: bool = False,
+    idle_redraw_seconds: float = 60.0,
+    events_file: Optional[str] = None,
+    query_text: str = '',
+):
+    # After the initial load, changes come from tailing the change feed when
+    # one exists (work proportional to the events), otherwise from re-reading
+    # the state file when its mtime/size changes. Only changed tickets are
+    # applied to the model, and the screen is redrawn at most `fps` times per
+    # second (or every `idle_redraw_seconds` so ages advance). The visible
+    # page is adjusted from the changed tickets alone; the query only runs
+    # over the whole model on idle redraws, so relative terms such as
+    # age>24h stay current.
+    if user and user.get('role') == 'admin':
+        title = "HelpDesk — Admin Dashboard (live)"
+    else:
+        title = "HelpDesk — User Dashboard (live)"
+        query_text = involving(user['user_id'] if user else None, query_text)
+    model = LiveModel(sla_hours, aging_buckets)
+    feed = ChangeFeed(events_file) if events_file else None
+    cursor = feed.last_seq() if feed else 0
+    watcher = StateWatcher(state_file)
+    frame = 1.0 / fps
+    state = watcher.poll()
+    if state:
+        model.apply_state(state.get('tickets', {}))
+    tail = FeedWatcher(feed, cursor) if feed and (cursor or not state) else None
+    view = LivePage(query_text, page, page_size, sort, descending)
+    model.take_changed()
+    view.refresh(model)
+    last_draw = time.monotonic()
+    with Live(_live_view(model, view, title), console=console, auto_refresh=False, screen=False) as live:
+        try:
+            while True:
+                time.sleep(frame)
+                if tail is not None:
+                    changed = model.apply_events(tail.poll())
+                else:
+                    state = watcher.poll()
+                    changed = model.apply_state(state.get('tickets', {})) if state else 0
+                now = time.monotonic()
+                if now - last_draw >= idle_redraw_seconds:
+                    model.take_changed()
+                    view.refresh(model)
+                elif changed:
+                    view.update(model, model.take_changed())
+                else:
+                    continue
+                live.update(_live_view(model, view, title), refresh=True)
+                last_draw = now
+        except KeyboardInterrupt:
+            pass